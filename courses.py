@@ -1,7 +1,7 @@
 import sys
 from datetime import datetime, timedelta
-from icalendar import Event
-from icalendar.prop import vRecur
+from functools import lru_cache
+from timeparse import parse_date, parse_time
 
 
 # --- JSON 格式定义与验证 ---
@@ -16,6 +16,9 @@ SCHEDULE_REQUIRED_KEYS = [
     "total_weeks",
 ]
 
+# icalendar/RFC5545 使用两位缩写，按星期数 1-7 直接索引
+_WEEKDAY_ABBR = (None, "MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
 
 def validate_json(data, required_keys):
     """验证JSON数据是否包含所有必需的键"""
@@ -28,6 +31,7 @@ def validate_json(data, required_keys):
         sys.exit(1)
 
 
+@lru_cache(maxsize=64)
 def parse_weekday_string(s):
     """
     解析特殊的星期字符串。
@@ -36,10 +40,10 @@ def parse_weekday_string(s):
     """
     s = s.strip()
     week_type = "all"
-    if s.endswith("**"):
+    if s[-2:] == "**":
         week_type = "even"
         day_str = s[:-2]
-    elif s.endswith("*"):
+    elif s[-1:] == "*":
         week_type = "odd"
         day_str = s[:-1]
     else:
@@ -49,10 +53,8 @@ def parse_weekday_string(s):
         day_num = int(day_str)
         if not 1 <= day_num <= 7:
             raise ValueError
-        # icalendar/RFC5545 使用两位缩写: MO, TU, WE, TH, FR, SA, SU
-        weekday_map = {1: "MO", 2: "TU", 3: "WE", 4: "TH", 5: "FR", 6: "SA", 7: "SU"}
-        return day_num, week_type, weekday_map[day_num]
-    except (ValueError, KeyError):
+        return day_num, week_type, _WEEKDAY_ABBR[day_num]
+    except ValueError:
         print(
             f"错误: 无效的 weekday 格式: '{s}'。应为1-7的数字，可选后缀 '*' 或 '**'。",
             file=sys.stderr,
@@ -61,7 +63,7 @@ def parse_weekday_string(s):
 
 
 def process_course_data(data):
-    """根据课表JSON数据创建一组 icalendar.Event 对象"""
+    """根据课表JSON数据创建一组事件 (属性名 -> 值 的字典，见 ics_writer)"""
     print("调用函数: process_course_data")
     validate_json(data, SCHEDULE_REQUIRED_KEYS)
 
@@ -73,9 +75,9 @@ def process_course_data(data):
     total_weeks = data["total_weeks"]
 
     try:
-        start_time_obj = datetime.strptime(data["start_time"], "%H:%M").time()
-        end_time_obj = datetime.strptime(data["end_time"], "%H:%M").time()
-        reference_date = datetime.strptime(data["start_date"], "%Y-%m-%d").date()
+        start_time_obj = parse_time(data["start_time"])
+        end_time_obj = parse_time(data["end_time"])
+        reference_date = parse_date(data["start_date"])
     except ValueError as e:
         print(
             f"错误: 日期或时间格式不正确 (应为 YYYY-MM-DD 或 HH:MM): {e}",
@@ -85,6 +87,13 @@ def process_course_data(data):
 
     # 计算开课第一周的周一
     week_start_date = reference_date - timedelta(days=reference_date.weekday())
+    # 首次上课日期总落在这一周内，ISO周数的奇偶性只需计算一次
+    first_week_is_odd = week_start_date.isocalendar()[1] % 2 == 1
+
+    # 同一次生成的所有事件共用一个时间戳
+    dtstamp_now = datetime.now()
+    sh, sm = start_time_obj.hour, start_time_obj.minute
+    eh, em = end_time_obj.hour, end_time_obj.minute
 
     for weekday_item in data["weekday"]:
         target_weekday, week_type, rrule_weekday = parse_weekday_string(weekday_item)
@@ -94,27 +103,25 @@ def process_course_data(data):
         first_class_date = week_start_date + timedelta(days=days_offset)
 
         # 根据单双周调整首次上课日期
-        if week_type == "even" and first_class_date.isocalendar()[1] % 2 != 0:
+        if week_type == "even" and first_week_is_odd:
             first_class_date += timedelta(weeks=1)
-        elif week_type == "odd" and first_class_date.isocalendar()[1] % 2 == 0:
+        elif week_type == "odd" and not first_week_is_odd:
             first_class_date += timedelta(weeks=1)
 
-        event = Event()
-        event.add("summary", course_name)
-        event.add("location", location)
-
-        # 结合日期和时间创建datetime对象
-        event.add("dtstart", datetime.combine(first_class_date, start_time_obj))
-        event.add("dtend", datetime.combine(first_class_date, end_time_obj))
-        event.add("dtstamp", datetime.now())  # 事件创建时间戳
-
         # 创建重复规则 (RRULE)
         interval = 1 if week_type == "all" else 2
         count = total_weeks if week_type == "all" else (total_weeks + 1) // 2
 
-        # vRecur 需要一个字典，键必须是大写
-        rrule = vRecur(freq="WEEKLY", interval=interval, count=count)
-        event.add("rrule", rrule)
+        # 结合日期和时间创建datetime对象
+        y, m, d = first_class_date.year, first_class_date.month, first_class_date.day
+        event = {
+            "summary": course_name,
+            "location": location,
+            "dtstart": datetime(y, m, d, sh, sm),
+            "dtend": datetime(y, m, d, eh, em),
+            "dtstamp": dtstamp_now,  # 事件创建时间戳
+            "rrule": {"freq": "WEEKLY", "interval": interval, "count": count},
+        }
 
         week_type_map = {"all": "每周", "odd": "单周", "even": "双周"}
         print(
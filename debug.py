@@ -2,17 +2,18 @@
 # -*- coding: utf-8 -*-
 
 import sys
-from icalendar import Calendar
-from weekmarks import load_jsonc_or_json
+from weekmarks import load_jsonc_or_json, process_weekmarks_data
 from courses import process_course_data
-from weekmarks import process_weekmarks_data
 
 
 def _print_event(ev, index=None):
     idx = f"{index + 1}. " if index is not None else ""
     summary = ev.get("summary")
-    dtstart = ev.get("dtstart").dt
-    dtend = ev.get("dtend").dt
+    dtstart = ev.get("dtstart")
+    dtend = ev.get("dtend")
+    # icalendar properties (from .ics files) wrap the value in .dt
+    dtstart = getattr(dtstart, "dt", dtstart)
+    dtend = getattr(dtend, "dt", dtend)
     print(f"{idx}标题: {summary}")
     # dtstart/dtend may be date or datetime
     try:
@@ -49,6 +50,13 @@ def debug_json(filepath):
 
 def debug_ics(filepath):
     """Read an .ics file and print contained events."""
+    # only .ics debugging needs icalendar; keep it off the JSON paths
+    try:
+        from icalendar import Calendar
+    except ImportError:
+        print("错误: 需要安装 icalendar 才能解析ICS文件。", file=sys.stderr)
+        return
+
     try:
         with open(filepath, "rb") as f:
             cal = Calendar.from_ical(f.read())
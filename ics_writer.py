@@ -0,0 +1,109 @@
+from datetime import datetime
+from functools import lru_cache
+
+PRODID = "-//My Course Schedule Generator//example.com//"
+
+# RFC5545 TEXT 转义: 反斜杠、分号、逗号和换行
+_TEXT_ESCAPE = str.maketrans({"\\": "\\\\", ";": "\\;", ",": "\\,", "\n": "\\n"})
+
+
+def _escape_text(s):
+    return s.replace("\r\n", "\n").translate(_TEXT_ESCAPE)
+
+
+def _fold(line, limit=75):
+    """Fold a content line so that no physical line exceeds `limit` octets."""
+    if line.isascii() and "\\" not in line:
+        if len(line) < limit:
+            return line
+        return "\r\n ".join(
+            line[i : i + limit - 1] for i in range(0, len(line), limit - 1)
+        )
+    folded = []
+    current = []
+    byte_count = 0
+    escape_open = False  # 上一个字符是尚未配对的转义反斜杠
+    for ch in line:
+        ch_len = len(ch.encode("utf-8"))
+        if current and byte_count + ch_len >= limit:
+            if escape_open and len(current) > 1:
+                # 不把转义序列拆到两行：反斜杠随下一个字符一起换行
+                current.pop()
+                folded.append("".join(current))
+                current = ["\\"]
+                byte_count = 1
+            else:
+                folded.append("".join(current))
+                current = []
+                byte_count = 0
+        current.append(ch)
+        byte_count += ch_len
+        escape_open = ch == "\\" and not escape_open
+    if current:
+        folded.append("".join(current))
+    return "\r\n ".join(folded)
+
+
+@lru_cache(maxsize=256)
+def _text_line(name, value):
+    # 同一课程的多个事件共享 SUMMARY/LOCATION，转义和折行结果可直接复用
+    return _fold(f"{name}:{_escape_text(value)}")
+
+
+def _format_dt(name, value):
+    # datetime 是 date 的子类，需先判断
+    if isinstance(value, datetime):
+        return f"{name}:{value:%Y%m%dT%H%M%S}"
+    return f"{name};VALUE=DATE:{value:%Y%m%d}"
+
+
+def _emit_vevent(buf, summary, location, dtstart, dtend, dtstamp, interval, count):
+    """Append one VEVENT to `buf`; location and the RRULE are optional."""
+    buf.append("BEGIN:VEVENT")
+    buf.append(_text_line("SUMMARY", summary))
+    buf.append(_format_dt("DTSTART", dtstart))
+    buf.append(_format_dt("DTEND", dtend))
+    # DTSTAMP 按 RFC5545 必须是 UTC 形式，与 icalendar 一致带 Z 后缀
+    buf.append(f"DTSTAMP:{dtstamp:%Y%m%dT%H%M%S}Z")
+    if count is not None:
+        buf.append(f"RRULE:FREQ=WEEKLY;COUNT={count};INTERVAL={interval}")
+    if location is not None:
+        buf.append(_text_line("LOCATION", location))
+    buf.append("END:VEVENT")
+
+
+def events_to_ical(events):
+    """Serialize event dicts (see process_course_data) straight to ICS bytes."""
+    buf = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}"]
+    for ev in events:
+        rrule = ev.get("rrule")
+        _emit_vevent(
+            buf,
+            ev["summary"],
+            ev.get("location"),
+            ev["dtstart"],
+            ev["dtend"],
+            ev["dtstamp"],
+            rrule and rrule["interval"],
+            rrule and rrule["count"],
+        )
+    buf.append("END:VCALENDAR")
+    buf.append("")
+    return "\r\n".join(buf).encode("utf-8")
+
+
+def events_to_ical_strict(events):
+    """Serialize event dicts through the icalendar library (for round-trip checks)."""
+    # icalendar 加载较慢，只在 --strict 路径中导入
+    from icalendar import Calendar, Event, vRecur
+
+    cal = Calendar()
+    # 添加一些标准的日历属性
+    cal.add("prodid", PRODID)
+    cal.add("version", "2.0")
+    for ev in events:
+        event = Event()
+        for name, value in ev.items():
+            event.add(name, vRecur(value) if name == "rrule" else value)
+        cal.add_component(event)
+    return cal.to_ical()
@@ -0,0 +1,30 @@
+from datetime import date, datetime, time
+
+
+def parse_date(s):
+    """Parse a YYYY-MM-DD string into a date, slicing the canonical form directly."""
+    if (
+        len(s) == 10
+        and s.isascii()
+        and s[4] == "-"
+        and s[7] == "-"
+        and s[0:4].isdigit()
+        and s[5:7].isdigit()
+        and s[8:10].isdigit()
+    ):
+        return date(int(s[0:4]), int(s[5:7]), int(s[8:10]))
+    # 其他写法交给 strptime，保持原有的校验和报错
+    return datetime.strptime(s, "%Y-%m-%d").date()
+
+
+def parse_time(s):
+    """Parse a HH:MM string into a time, slicing the canonical form directly."""
+    if (
+        len(s) == 5
+        and s.isascii()
+        and s[2] == ":"
+        and s[0:2].isdigit()
+        and s[3:5].isdigit()
+    ):
+        return time(int(s[0:2]), int(s[3:5]))
+    return datetime.strptime(s, "%H:%M").time()
@@ -1,8 +1,21 @@
 import json
 import re
 import sys
-from datetime import datetime, timedelta
-from icalendar import Event
+from datetime import date, datetime, timedelta
+from timeparse import parse_date
+
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    _json = json
+
+# JSON string literals are matched first so that "//" or "/*" inside them
+# is kept; only the comment alternatives are stripped.
+_JSONC_COMMENT_RE = re.compile(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', re.S)
+
+
+def _strip_jsonc_comment(m):
+    return m.group(1) or ""
 
 
 def load_jsonc_or_json(filepath):
@@ -10,22 +23,18 @@ def load_jsonc_or_json(filepath):
     if filepath.lower().endswith(".jsonc"):
         with open(filepath, "r", encoding="utf-8") as f:
             txt = f.read()
-        # remove single-line // comments
-        txt = re.sub(r"//.*", "", txt)
-        # remove C-style block comments
-        txt = re.sub(r"/\*.*?\*/", "", txt, flags=re.S)
-        try:
-            return json.loads(txt)
-        except json.JSONDecodeError as e:
-            print(f"错误: 无法解析JSONC文件 '{filepath}': {e}", file=sys.stderr)
-            raise
+        # remove // and /* */ comments in a single pass, leaving strings intact
+        txt = _JSONC_COMMENT_RE.sub(_strip_jsonc_comment, txt)
+        # 解析错误由调用方统一报告，这里不重复打印
+        return _json.loads(txt.encode("utf-8"))
     else:
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # plain JSON: no comment stripping, parse the raw bytes without decoding to str
+        with open(filepath, "rb") as f:
+            return _json.loads(f.read())
 
 
 def process_weekmarks_data(data):
-    """Process weekmarks data and return a list of Events."""
+    """Process weekmarks data and return a list of event dicts (see ics_writer)."""
     print("调用函数: process_weekmarks_data")
     if "start_date" not in data:
         print("错误: weekmarks JSON 必须包含 'start_date' 字段。", file=sys.stderr)
@@ -36,26 +45,31 @@ def process_weekmarks_data(data):
     total_weeks = data.get("total_weeks", 1)  # default to 1 if not specified
 
     try:
-        start_date = datetime.strptime(data["start_date"], "%Y-%m-%d").date()
+        start_date = parse_date(data["start_date"])
     except ValueError as e:
         print(f"错误: start_date 格式应为 YYYY-MM-DD: {e}", file=sys.stderr)
-        raise
+        raise SystemExit(1)
 
     # 计算 start_date 所在周的周一作为实际开始日期
     week_start_date = start_date - timedelta(days=start_date.weekday())
 
+    dtstamp_now = datetime.now()
+    # 以序数日期做整数运算，避免每周构造 timedelta
+    start_ord = week_start_date.toordinal()
     events = []
     for i in range(total_weeks):
-        week_start = week_start_date + timedelta(days=7 * i)
-        week_end = week_start + timedelta(days=7)
+        week_ord = start_ord + 7 * i
+        week_start = date.fromordinal(week_ord)
+        week_end = date.fromordinal(week_ord + 7)
         week_number = start_number + i
 
-        event = Event()
-        event.add("summary", name_tpl.format(week_number))
-        # use DATE (all-day) start and end (dtend is exclusive per RFC5545)
-        event.add("dtstart", week_start)
-        event.add("dtend", week_end)
-        event.add("dtstamp", datetime.now())
+        event = {
+            "summary": name_tpl.format(week_number),
+            # use DATE (all-day) start and end (dtend is exclusive per RFC5545)
+            "dtstart": week_start,
+            "dtend": week_end,
+            "dtstamp": dtstamp_now,
+        }
 
         events.append(event)
 